@@ -1,40 +1,226 @@
 import shutil
 import os
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from src.common.base_agent import BaseAgent
+from src.common.config import ForensicConfig as Config
 from src.common.logger import get_agent_logger
+from src.common import frame_store
 
 class VaultAgent(BaseAgent):
-    def __init__(self, event_bus, vault_dir):
+    def __init__(self, event_bus, vault_dir, compress=False, frame_size=None, workers=None):
         super().__init__("VaultAgent")
         self.event_bus = event_bus
         # Force absolute path to avoid 'ghost' copies
         self.vault_dir = Path(vault_dir).resolve()
         self.vault_dir.mkdir(parents=True, exist_ok=True)
         self.beliefs['total_vaulted'] = 0
+        self.beliefs['bytes_in'] = 0
+        self.beliefs['bytes_stored'] = 0
         self.logger = get_agent_logger(self.name)
 
+        # Resolved at construction so runtime changes to ForensicConfig take effect
+        self.compress = compress
+        self.frame_size = Config.VAULT_FRAME_SIZE if frame_size is None else frame_size
+        self.workers = Config.VAULT_WORKERS if workers is None else workers
+        if self.frame_size < 1:
+            raise ValueError(f"VaultAgent frame_size must be positive, got {self.frame_size}")
+        if self.workers < 1:
+            raise ValueError(f"VaultAgent needs at least one compression worker, got {self.workers}")
+        self.codec = frame_store.default_codec()
+        self.container_dir = self.vault_dir / frame_store.CONTAINER_DIR
+        # zlib and zstd release the GIL, so a thread pool compresses frames in parallel
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if compress else None
+
     def archive_file(self, data):
         source_path = Path(data['path']).resolve()
         destination_path = self.vault_dir / source_path.name
-        
+
         self.intention = f"vaulting_{source_path.name}"
-        
+
         try:
+            if self.compress and self._pool is None:
+                self.logger.warning(
+                    f"Compression pool is shut down; vaulting {source_path.name} as a raw copy"
+                )
+            elif self.compress and not self._sniff_incompressible(source_path):
+                self._archive_compressed(source_path, data.get('hash'))
+                return
+
+            if self.compress and destination_path == self.container_dir:
+                raise ValueError(f"'{source_path.name}' is reserved for compressed containers")
+
             # copy2 preserves metadata (timestamps), vital for forensics
             shutil.copy2(str(source_path), str(destination_path))
-            
+
             # Verification check
             if destination_path.exists():
+                if self.compress:
+                    self._remove_stale_container(source_path.name)
                 self.beliefs['total_vaulted'] += 1
+                size = destination_path.stat().st_size
+                self.beliefs['bytes_in'] += size
+                self.beliefs['bytes_stored'] += size
                 self.logger.info(f"Verified: {source_path.name} copied to {self.vault_dir}")
             else:
                 self.logger.error(f"Copy failed: {destination_path} does not exist after shutil.copy2")
-                
+
         except Exception as e:
             self.logger.error(f"Vaulting exception for {source_path.name}: {str(e)}")
         finally:
             self.intention = "idle"
 
+    def _container_path(self, file_name):
+        return self.container_dir / (file_name + frame_store.CONTAINER_SUFFIX)
+
+    def _owns_container(self, container_path, file_name):
+        """True only for a valid container whose index names this evidence item."""
+        index = frame_store.read_index(container_path)
+        return index is not None and index.get('source_name') == file_name
+
+    def _remove_stale_container(self, file_name):
+        """A raw re-vault supersedes this item's container, and only this item's."""
+        container_path = self._container_path(file_name)
+        if not container_path.exists():
+            return
+        if not self._owns_container(container_path, file_name):
+            self.logger.warning(f"Left {container_path.name} in place: it is not a container for {file_name}")
+            return
+        container_path.unlink()
+        self.logger.warning(f"Removed superseded vault copy: {container_path.name}")
+
+    def _sniff_incompressible(self, source_path):
+        """Already-compressed or high-entropy evidence is vaulted as a raw copy."""
+        with open(source_path, "rb") as f:
+            sample = f.read(frame_store.PROBE_SIZE)
+        if frame_store.is_incompressible(sample[:16]) or frame_store.is_container(source_path):
+            self.logger.info(f"Skipping compression for {source_path.name}: already compressed format")
+            return True
+        if frame_store.probe_incompressible(self.codec, sample):
+            self.logger.info(f"Skipping compression for {source_path.name}: sample does not compress")
+            return True
+        return False
+
+    def _archive_compressed(self, source_path, expected_hash):
+        """
+        Writes the evidence as independently decompressible frames plus a frame index,
+        then re-reads the container to prove the original SHA-256 survived.
+        """
+        self.container_dir.mkdir(exist_ok=True)
+        container_path = self._container_path(source_path.name)
+        partial_path = container_path.with_name(container_path.name + ".partial")
+
+        if not expected_hash:
+            self.logger.warning(
+                f"No processor hash for {source_path.name}; verifying against the vaulting pass only"
+            )
+
+        digest = hashlib.sha256()
+        frames = []
+        offset = 0
+        # Bounded window of in-flight frames keeps memory flat for large evidence
+        pending = deque()
+
+        def drain_one(out):
+            nonlocal offset
+            codec, payload = pending.popleft().result()
+            out.write(payload)
+            frames.append({'offset': offset, 'length': len(payload), 'codec': codec})
+            offset += len(payload)
+
+        try:
+            with open(source_path, "rb") as src, open(partial_path, "wb") as out:
+                while True:
+                    raw = src.read(self.frame_size)
+                    if not raw:
+                        break
+                    digest.update(raw)
+                    pending.append(self._pool.submit(frame_store.compress_frame, self.codec, raw))
+                    if len(pending) >= self.workers * 2:
+                        drain_one(out)
+                while pending:
+                    drain_one(out)
+
+                original_size = src.tell()
+                frame_store.write_index(out, {
+                    'source_name': source_path.name,
+                    'codec': self.codec,
+                    'frame_size': self.frame_size,
+                    'original_size': original_size,
+                    'sha256': digest.hexdigest(),
+                    'frames': frames
+                })
+
+            # Verification check: hash the decompressed stream, not the source
+            verified = self._verify_container(partial_path, expected_hash or digest.hexdigest())
+        except BaseException:
+            # Never leave half-written containers behind in the vault
+            for future in pending:
+                future.cancel()
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        if not verified:
+            partial_path.unlink()
+            self.logger.error(f"Compressed vaulting failed verification for {source_path.name}")
+            return
+
+        os.replace(partial_path, container_path)
+        # Preserve source timestamps on the container, matching shutil.copy2
+        shutil.copystat(str(source_path), str(container_path))
+        # The raw copy under the same name is this item's other format
+        raw_path = self.vault_dir / source_path.name
+        if raw_path.is_file():
+            raw_path.unlink()
+            self.logger.warning(f"Removed superseded vault copy: {raw_path.name}")
+
+        stored_size = container_path.stat().st_size
+        self.beliefs['total_vaulted'] += 1
+        self.beliefs['bytes_in'] += original_size
+        self.beliefs['bytes_stored'] += stored_size
+        self.logger.info(
+            f"Verified: {source_path.name} compressed to {container_path.name} "
+            f"({original_size} -> {stored_size} bytes, {self.codec})"
+        )
+
+    def _verify_container(self, container_path, expected_hash):
+        digest = hashlib.sha256()
+        with frame_store.FrameReader(container_path) as reader:
+            for chunk in reader.iter_frames():
+                digest.update(chunk)
+        return digest.hexdigest() == expected_hash
+
+    def read_evidence(self, file_name, offset=0, size=-1):
+        """
+        Transparent read of vaulted evidence, whether stored raw or compressed.
+        Compressed containers only decompress the frames covering the range.
+        """
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+
+        container_path = self._container_path(file_name)
+        raw_path = self.vault_dir / file_name
+        use_container = container_path.exists() and self._owns_container(container_path, file_name)
+        if use_container and raw_path.is_file():
+            # Only reachable when a non-compressing agent re-vaulted the item: newest wins
+            self.logger.warning(f"Both raw and compressed copies of {file_name} exist; reading the newer")
+            use_container = container_path.stat().st_ctime_ns > raw_path.stat().st_ctime_ns
+
+        if use_container:
+            with frame_store.FrameReader(container_path) as reader:
+                return reader.read(offset, size)
+
+        with open(raw_path, "rb") as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def shutdown(self):
+        """Releases the compression worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
     def perceive(self): pass
-    def act(self): pass
\ No newline at end of file
+    def act(self): pass
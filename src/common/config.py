@@ -12,5 +12,10 @@ class ForensicConfig:
     # Agent Settings
     POLLING_INTERVAL = 10  # seconds
     
+    # Vault Storage
+    VAULT_COMPRESSION = False  # Store evidence as seekable compressed containers
+    VAULT_FRAME_SIZE = 1024 * 1024  # bytes of original data per frame
+    VAULT_WORKERS = 4  # compression threads
+    
     # Logging
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
\ No newline at end of file
@@ -0,0 +1,192 @@
+import io
+import json
+import struct
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency: fall back to the standard library
+    zstandard = None
+
+# Container layout: [frame 0][frame 1]...[JSON frame index][footer]
+# Every frame is compressed on its own, so any offset can be served by
+# decompressing only the frames that overlap it.
+MAGIC = b"FVAULT01"
+FOOTER = struct.Struct("<Q8s")
+CONTAINER_SUFFIX = ".fvz"
+# Containers live in their own vault subdirectory so no raw evidence name,
+# including one that itself ends in CONTAINER_SUFFIX, can land on their path.
+CONTAINER_DIR = ".compressed"
+
+# Entropy probe: a sample that compresses worse than this ratio marks the
+# whole file as incompressible (encrypted blobs, carved media, disk slices).
+PROBE_SIZE = 64 * 1024
+PROBE_MAX_RATIO = 0.95
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+CODEC_STORED = "stored"
+
+# Leading signatures of formats that are already compressed or encrypted.
+# Spending CPU on these only burns worker time for a near-zero saving.
+INCOMPRESSIBLE_SIGNATURES = (
+    b"\xff\xd8\xff",             # JPEG
+    b"\x89PNG\r\n\x1a\n",        # PNG
+    b"GIF8",                     # GIF
+    b"PK\x03\x04",               # ZIP / DOCX / XLSX / JAR / APK
+    b"PK\x05\x06",               # Empty ZIP
+    b"\x1f\x8b",                 # GZIP
+    b"BZh",                      # BZIP2
+    b"\xfd7zXZ\x00",             # XZ
+    b"7z\xbc\xaf\x27\x1c",       # 7-Zip
+    b"Rar!\x1a\x07",             # RAR
+    b"\x28\xb5\x2f\xfd",         # Zstandard
+    b"OggS",                     # OGG
+    b"fLaC",                     # FLAC
+    b"ID3",                      # MP3
+)
+
+
+def default_codec():
+    """Prefers zstd when the optional package is installed, otherwise zlib."""
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+
+def is_incompressible(header):
+    """Sniffs the first bytes of a file for known compressed formats."""
+    if header.startswith(INCOMPRESSIBLE_SIGNATURES):
+        return True
+    # ISO base media (MP4 / MOV / HEIC) carries its brand at offset 4
+    return header[4:8] == b"ftyp"
+
+
+def probe_incompressible(codec, sample):
+    """Trial-compresses a leading sample and reports whether it barely shrinks."""
+    if not sample:
+        return False
+    codec_used, payload = compress_frame(codec, sample)
+    return codec_used == CODEC_STORED or len(payload) > len(sample) * PROBE_MAX_RATIO
+
+
+def compress_frame(codec, raw, level=3):
+    """
+    Compresses a single frame. Returns (codec_used, payload).
+    Frames that do not shrink are kept verbatim as 'stored'.
+    """
+    if codec == CODEC_ZSTD:
+        payload = zstandard.ZstdCompressor(level=level).compress(raw)
+    elif codec == CODEC_ZLIB:
+        payload = zlib.compress(raw, level)
+    else:
+        raise ValueError(f"Unsupported vault codec: {codec}")
+
+    if len(payload) >= len(raw):
+        return CODEC_STORED, raw
+    return codec, payload
+
+
+def decompress_frame(codec, payload):
+    """Reverses compress_frame for a single frame."""
+    if codec == CODEC_STORED:
+        return payload
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Container uses zstd but the 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unsupported vault codec: {codec}")
+
+
+def read_index(path):
+    """Returns the frame index of a container, or None for any other file."""
+    if not is_container(path):
+        return None
+    try:
+        with FrameReader(path) as reader:
+            return reader.index
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_index(stream, index):
+    """Appends the frame index and footer after the last frame."""
+    blob = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    stream.write(blob)
+    stream.write(FOOTER.pack(len(blob), MAGIC))
+
+
+def is_container(path):
+    """Checks the footer magic to tell vault containers from raw copies."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, io.SEEK_END)
+            if f.tell() < FOOTER.size:
+                return False
+            f.seek(-FOOTER.size, io.SEEK_END)
+            _, magic = FOOTER.unpack(f.read(FOOTER.size))
+            return magic == MAGIC
+    except OSError:
+        return False
+
+
+class FrameReader:
+    """
+    Random-access reader over a compressed vault container.
+    Only the frames overlapping the requested range are decompressed.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self.index = self._load_index()
+        except Exception:
+            self._file.close()
+            raise
+        self.frames = self.index['frames']
+        self.size = self.index['original_size']
+        self.sha256 = self.index['sha256']
+
+    def _load_index(self):
+        self._file.seek(0, io.SEEK_END)
+        if self._file.tell() < FOOTER.size:
+            raise ValueError(f"{self.path} is too small to be a vault container")
+        self._file.seek(-FOOTER.size, io.SEEK_END)
+        index_len, magic = FOOTER.unpack(self._file.read(FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a vault container")
+        self._file.seek(-(FOOTER.size + index_len), io.SEEK_END)
+        return json.loads(self._file.read(index_len).decode("utf-8"))
+
+    def _frame(self, i):
+        frame = self.frames[i]
+        self._file.seek(frame['offset'])
+        return decompress_frame(frame['codec'], self._file.read(frame['length']))
+
+    def iter_frames(self):
+        """Streams the original content frame by frame."""
+        for i in range(len(self.frames)):
+            yield self._frame(i)
+
+    def read(self, offset=0, size=-1):
+        """Returns `size` original bytes starting at `offset` (-1 reads to EOF)."""
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+        end = self.size if size < 0 else min(self.size, offset + size)
+        if offset >= end:
+            return b""
+
+        frame_size = self.index['frame_size']
+        first, last = offset // frame_size, (end - 1) // frame_size
+        chunks = [self._frame(i) for i in range(first, last + 1)]
+        start = offset - first * frame_size
+        return b"".join(chunks)[start:start + (end - offset)]
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -38,7 +38,7 @@ def main():
     
     # Pathing: Ensuring the vault resides within the data boundary
     vault_path = Config.ROOT_DIR / "data" / "evidence_vault"
-    vault = VaultAgent(bus, vault_path)
+    vault = VaultAgent(bus, vault_path, compress=Config.VAULT_COMPRESSION)
     
     # 4. Wire Up The Forensic Pipeline (Observer Pattern)
     bus.subscribe("FILE_FOUND", processor.process_file)
@@ -66,6 +66,9 @@ def main():
     except KeyboardInterrupt:
         logger.warning("Shutdown signal detected. Finalizing audit logs.")
         print("\n[!] Shutdown sequence complete.")
+    finally:
+        # Release the compression workers on any exit path
+        vault.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,331 @@
+import pytest
+import hashlib
+import os
+from unittest.mock import MagicMock
+from src.agents.vault import VaultAgent
+from src.common import frame_store
+from src.common.config import ForensicConfig as Config
+
+def vault_files(vault_dir):
+    """Relative paths of every file in the vault, containers included."""
+    return sorted(str(p.relative_to(vault_dir)) for p in vault_dir.rglob("*") if p.is_file())
+
+
+def container_path(vault_dir, name):
+    return vault_dir / frame_store.CONTAINER_DIR / (name + frame_store.CONTAINER_SUFFIX)
+
+
+class TestVaultAgent:
+    """
+    Tests for VaultAgent focusing on raw and compressed evidence preservation.
+    """
+
+    def test_raw_vaulting_copies_file(self, mock_event_bus, tmp_path):
+        """
+        Verifies the default behaviour: a byte-for-byte copy in the vault.
+        """
+        evidence = tmp_path / "evidence.txt"
+        evidence.write_bytes(b"Forensic Evidence Data")
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault")
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(b"Forensic Evidence Data").hexdigest()})
+
+        assert (tmp_path / "vault" / "evidence.txt").read_bytes() == b"Forensic Evidence Data"
+        assert agent.beliefs['total_vaulted'] == 1
+        assert agent.intention == "idle"
+
+    def test_compressed_vaulting_shrinks_and_round_trips(self, mock_event_bus, tmp_path):
+        """
+        Verifies that compressible evidence is stored as a smaller, verifiable container.
+        """
+        # 1. Arrange: Several frames worth of repetitive log data
+        content = b"2024-01-01 login failed for user admin\n" * 2000
+        evidence = tmp_path / "auth.log"
+        evidence.write_bytes(content)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True, frame_size=4096, workers=2)
+
+        # 2. Act
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(content).hexdigest()})
+        agent.shutdown()
+
+        # 3. Assert: Container replaces the raw copy and is smaller than the original
+        container = container_path(tmp_path / "vault", "auth.log")
+        assert container.exists()
+        assert not (tmp_path / "vault" / "auth.log").exists()
+        assert container.stat().st_size < len(content)
+        assert agent.beliefs['total_vaulted'] == 1
+
+        with frame_store.FrameReader(container) as reader:
+            assert reader.sha256 == hashlib.sha256(content).hexdigest()
+            assert len(reader.frames) == -(-len(content) // 4096)
+            assert b"".join(reader.iter_frames()) == content
+
+    def test_read_evidence_serves_arbitrary_offsets(self, mock_event_bus, tmp_path):
+        """
+        Verifies random access across frame boundaries without a full decompression.
+        """
+        content = bytes(range(256)) * 100
+        evidence = tmp_path / "disk.img"
+        evidence.write_bytes(content)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True, frame_size=1000, workers=2)
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(content).hexdigest()})
+        agent.shutdown()
+
+        assert agent.read_evidence("disk.img") == content
+        assert agent.read_evidence("disk.img", offset=995, size=10) == content[995:1005]
+        assert agent.read_evidence("disk.img", offset=len(content) - 3, size=50) == content[-3:]
+        assert agent.read_evidence("disk.img", offset=len(content) + 10, size=5) == b""
+        with pytest.raises(ValueError):
+            agent.read_evidence("disk.img", offset=-1, size=5)
+
+        # The raw storage format rejects a negative offset the same way
+        raw_agent = VaultAgent(mock_event_bus, tmp_path / "raw_vault")
+        raw_agent.archive_file({'path': evidence, 'hash': hashlib.sha256(content).hexdigest()})
+        assert raw_agent.read_evidence("disk.img", offset=995, size=10) == content[995:1005]
+        with pytest.raises(ValueError):
+            raw_agent.read_evidence("disk.img", offset=-1, size=5)
+
+    def test_incompressible_formats_are_copied_raw(self, mock_event_bus, tmp_path):
+        """
+        Verifies that JPEG evidence skips compression and stays readable.
+        """
+        content = b"\xff\xd8\xff\xe0" + b"\x00JFIF" * 50
+        evidence = tmp_path / "photo.jpg"
+        evidence.write_bytes(content)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True)
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(content).hexdigest()})
+        agent.shutdown()
+
+        assert (tmp_path / "vault" / "photo.jpg").read_bytes() == content
+        assert not container_path(tmp_path / "vault", "photo.jpg").exists()
+        assert agent.read_evidence("photo.jpg", offset=4, size=5) == b"\x00JFIF"
+
+    def test_hash_mismatch_is_not_vaulted(self, mock_event_bus, tmp_path):
+        """
+        Verifies that a container failing SHA-256 verification is discarded.
+        """
+        evidence = tmp_path / "tampered.txt"
+        evidence.write_bytes(b"A" * 10000)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True)
+
+        agent.archive_file({'path': evidence, 'hash': "0" * 64})
+        agent.shutdown()
+
+        assert vault_files(tmp_path / "vault") == []
+        assert agent.beliefs['total_vaulted'] == 0
+
+    def test_compression_failure_leaves_no_partial_file(self, mock_event_bus, tmp_path, monkeypatch):
+        """
+        Verifies that an error mid-write does not leave a .partial container behind.
+        """
+        evidence = tmp_path / "x.txt"
+        evidence.write_bytes(b"B" * 10000)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True, frame_size=1000)
+
+        def failing_compress(*args, **kwargs):
+            raise RuntimeError("boom")
+        # Let the entropy probe pass so the failure happens inside the worker pool
+        monkeypatch.setattr(frame_store, "probe_incompressible", lambda codec, sample: False)
+        monkeypatch.setattr(frame_store, "compress_frame", failing_compress)
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(b"B" * 10000).hexdigest()})
+        agent.shutdown()
+
+        assert vault_files(tmp_path / "vault") == []
+        assert agent.beliefs['total_vaulted'] == 0
+        assert agent.intention == "idle"
+
+    def test_revaulting_replaces_copy_in_other_format(self, mock_event_bus, tmp_path):
+        """
+        Verifies the vault never holds a raw copy and a container for the same item.
+        """
+        vault_dir = tmp_path / "vault"
+        evidence = tmp_path / "g.txt"
+        evidence.write_bytes(b"first version\n" * 20)
+        raw_agent = VaultAgent(mock_event_bus, vault_dir)
+        raw_agent.archive_file({'path': evidence, 'hash': hashlib.sha256(evidence.read_bytes()).hexdigest()})
+
+        # 1. Raw -> compressed: the stale raw copy is superseded
+        evidence.write_bytes(b"second version\n" * 20)
+        agent = VaultAgent(mock_event_bus, vault_dir, compress=True)
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(evidence.read_bytes()).hexdigest()})
+        assert vault_files(vault_dir) == [f"{frame_store.CONTAINER_DIR}/g.txt{frame_store.CONTAINER_SUFFIX}"]
+        assert agent.read_evidence("g.txt") == b"second version\n" * 20
+
+        # 2. Compressed -> raw (incompressible content): the stale container is superseded
+        third = b"\xff\xd8\xff\xe0" + b"third version\n" * 20
+        evidence.write_bytes(third)
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(third).hexdigest()})
+        agent.shutdown()
+        assert vault_files(vault_dir) == ["g.txt"]
+        assert agent.read_evidence("g.txt") == third
+
+    def test_distinct_items_named_like_containers_are_kept(self, mock_event_bus, tmp_path):
+        """
+        Verifies that evidence 'X' and separate evidence 'X.fvz' never overwrite each other.
+        """
+        staging = tmp_path / "staging"
+        staging.mkdir()
+        notes = staging / "notes"
+        notes.write_bytes(b"case notes\n" * 50)
+        lookalike = staging / ("notes" + frame_store.CONTAINER_SUFFIX)
+        lookalike.write_bytes(b"unrelated evidence\n" * 50)
+
+        for compress in (False, True):
+            vault_dir = tmp_path / f"vault_{compress}"
+            agent = VaultAgent(mock_event_bus, vault_dir, compress=compress)
+
+            # Both orders: the lookalike first, then the item, then the lookalike again
+            for item in (lookalike, notes, lookalike):
+                agent.archive_file({'path': item, 'hash': hashlib.sha256(item.read_bytes()).hexdigest()})
+            agent.shutdown()
+
+            assert agent.beliefs['total_vaulted'] == 3
+            assert agent.read_evidence("notes") == notes.read_bytes()
+            assert agent.read_evidence(lookalike.name) == lookalike.read_bytes()
+        # Default mode keeps plain copies exactly as before
+        assert vault_files(tmp_path / "vault_False") == ["notes", lookalike.name]
+
+    def test_existing_container_is_not_recompressed(self, mock_event_bus, tmp_path):
+        """
+        Verifies that evidence which is itself a vault container is copied raw.
+        """
+        evidence = tmp_path / "empty.txt"
+        evidence.write_bytes(b"")
+        agent = VaultAgent(mock_event_bus, tmp_path / "staging", compress=True)
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(b"").hexdigest()})
+        agent.shutdown()
+        container = container_path(tmp_path / "staging", "empty.txt")
+
+        vault_dir = tmp_path / "vault"
+        vault = VaultAgent(mock_event_bus, vault_dir, compress=True)
+        vault.archive_file({'path': container, 'hash': hashlib.sha256(container.read_bytes()).hexdigest()})
+        vault.shutdown()
+
+        assert vault_files(vault_dir) == [container.name]
+        assert vault.read_evidence(container.name) == container.read_bytes()
+        # The raw copy is not mistaken for a container of 'empty.txt'
+        with pytest.raises(FileNotFoundError):
+            vault.read_evidence("empty.txt")
+
+    def test_high_entropy_data_is_copied_raw(self, mock_event_bus, tmp_path, monkeypatch):
+        """
+        Verifies that random bytes without a known signature skip the worker pool.
+        """
+        content = os.urandom(50000)
+        evidence = tmp_path / "blob.bin"
+        evidence.write_bytes(content)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True, frame_size=4096)
+        submitted = []
+        monkeypatch.setattr(agent._pool, "submit", lambda *args: submitted.append(args))
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(content).hexdigest()})
+        agent.shutdown()
+
+        assert submitted == []
+        assert vault_files(tmp_path / "vault") == ["blob.bin"]
+        assert agent.read_evidence("blob.bin", offset=4090, size=20) == content[4090:4110]
+
+    def test_settings_resolve_from_config_at_construction(self, mock_event_bus, tmp_path, monkeypatch):
+        """
+        Verifies defaults follow runtime ForensicConfig changes and bad worker counts are rejected.
+        """
+        monkeypatch.setattr(Config, "VAULT_FRAME_SIZE", 2048)
+        monkeypatch.setattr(Config, "VAULT_WORKERS", 3)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault")
+        assert agent.frame_size == 2048
+        assert agent.workers == 3
+
+        with pytest.raises(ValueError, match="worker"):
+            VaultAgent(mock_event_bus, tmp_path / "vault", compress=True, workers=0)
+
+    def test_archive_after_shutdown_falls_back_to_raw(self, mock_event_bus, tmp_path):
+        """
+        Verifies that a closed compression pool degrades to a raw copy instead of failing.
+        """
+        evidence = tmp_path / "late.txt"
+        evidence.write_bytes(b"C" * 5000)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True)
+        agent.shutdown()
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(b"C" * 5000).hexdigest()})
+
+        assert (tmp_path / "vault" / "late.txt").read_bytes() == b"C" * 5000
+        assert agent.beliefs['total_vaulted'] == 1
+
+    def test_missing_processor_hash_is_logged(self, mock_event_bus, tmp_path):
+        """
+        Verifies the audit trail records when no independent hash was checked.
+        """
+        evidence = tmp_path / "nohash.txt"
+        evidence.write_bytes(b"D" * 5000)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True)
+        agent.logger = MagicMock()
+
+        agent.archive_file({'path': evidence})
+        agent.shutdown()
+
+        agent.logger.warning.assert_called_once()
+        assert "No processor hash" in agent.logger.warning.call_args[0][0]
+        assert agent.beliefs['total_vaulted'] == 1
+
+    def test_read_evidence_exact_frame_multiple(self, mock_event_bus, tmp_path):
+        """
+        Verifies boundary arithmetic when the size is an exact multiple of frame_size.
+        """
+        content = bytes(range(250)) * 16
+        evidence = tmp_path / "aligned.bin"
+        evidence.write_bytes(content)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True, frame_size=1000, workers=2)
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(content).hexdigest()})
+        agent.shutdown()
+
+        with frame_store.FrameReader(container_path(tmp_path / "vault", "aligned.bin")) as reader:
+            assert len(reader.frames) == 4
+        assert agent.read_evidence("aligned.bin") == content
+        assert agent.read_evidence("aligned.bin", offset=3000, size=1000) == content[3000:]
+        assert agent.read_evidence("aligned.bin", offset=2999, size=2) == content[2999:3001]
+        assert agent.read_evidence("aligned.bin", offset=3999, size=10) == content[3999:]
+        assert agent.read_evidence("aligned.bin", offset=4000) == b""
+
+    def test_zstd_round_trip(self, mock_event_bus, tmp_path):
+        """
+        Verifies the zstd codec path when the optional package is installed.
+        """
+        pytest.importorskip("zstandard")
+        content = b"zstd frame payload " * 1000
+        evidence = tmp_path / "z.txt"
+        evidence.write_bytes(content)
+        agent = VaultAgent(mock_event_bus, tmp_path / "vault", compress=True, frame_size=4096)
+        agent.codec = frame_store.CODEC_ZSTD
+
+        agent.archive_file({'path': evidence, 'hash': hashlib.sha256(content).hexdigest()})
+        agent.shutdown()
+
+        with frame_store.FrameReader(container_path(tmp_path / "vault", "z.txt")) as reader:
+            assert reader.index['codec'] == frame_store.CODEC_ZSTD
+        assert agent.read_evidence("z.txt", offset=4090, size=20) == content[4090:4110]
+
+    def test_zstd_container_without_package_raises(self, tmp_path, monkeypatch):
+        """
+        Verifies the documented RuntimeError when zstd frames cannot be decoded.
+        """
+        container = tmp_path / ("z.bin" + frame_store.CONTAINER_SUFFIX)
+        payload = b"\x28\xb5\x2f\xfd-not-decoded"
+        with open(container, "wb") as out:
+            out.write(payload)
+            frame_store.write_index(out, {
+                'codec': frame_store.CODEC_ZSTD,
+                'frame_size': 1024,
+                'original_size': 100,
+                'sha256': "0" * 64,
+                'frames': [{'offset': 0, 'length': len(payload), 'codec': frame_store.CODEC_ZSTD}]
+            })
+        monkeypatch.setattr(frame_store, "zstandard", None)
+
+        with frame_store.FrameReader(container) as reader:
+            with pytest.raises(RuntimeError, match="zstandard"):
+                reader.read(0, 10)